@@ -1,15 +1,26 @@
+import asyncio
 import logging
-import time
+import math
+import re
+import threading
 import warnings
-from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
-import yfinance as yf
 from dcf import calculate_dcf_with_llm_rates
+from disk_cache import DiskCache, make_key
+from genai_client import AI_CACHE_TTL_SECONDS, TRANSIENT_ERRORS as AI_TRANSIENT_ERRORS
+from genai_client import get_client, is_transient_error, request_cache_key
+from rate_limit import TokenBucket
+from retry import async_retry_transient, retry_transient
+from yahoo_client import fetch_info, fetch_quotes, get_ticker, get_tickers
                  
 from google import genai
 
@@ -18,6 +29,13 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 warnings.filterwarnings('ignore')
 
+# Exchange symbols like AAPL, BRK-B, BRK.B, ^GSPC or EURUSD=X
+TICKER_PATTERN = re.compile(r"\^?[A-Z][A-Z0-9.\-=]{0,11}")
+
+def is_valid_ticker_format(ticker: str) -> bool:
+    """Cheap syntax check so malformed input never reaches Yahoo or Gemini"""
+    return bool(ticker) and TICKER_PATTERN.fullmatch(ticker.strip().upper()) is not None
+
 class ValuationMethod(Enum):
     PE_MULTIPLE = "PE_MULTIPLE"
     PB_MULTIPLE = "PB_MULTIPLE"
@@ -25,10 +43,11 @@ class ValuationMethod(Enum):
     COMPOSITE = "COMPOSITE"
     INSUFFICIENT_DATA = "INSUFFICIENT_DATA"
 
-@dataclass
+@dataclass(slots=True)
 class EssentialMetrics:
     """Minimal essential metrics for valuation"""
     ticker: str
+    full_name: Optional[str] = None
     market_cap: Optional[float] = None
     pe_ratio: Optional[float] = None
     pb_ratio: Optional[float] = None
@@ -44,9 +63,29 @@ class EssentialMetrics:
     revenue_growth: Optional[float] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Flat fields only, so a literal is much cheaper than the recursive asdict()
+        return {
+            'ticker': self.ticker,
+            'full_name': self.full_name,
+            'market_cap': self.market_cap,
+            'pe_ratio': self.pe_ratio,
+            'pb_ratio': self.pb_ratio,
+            'ps_ratio': self.ps_ratio,
+            'current_price': self.current_price,
+            'book_value_per_share': self.book_value_per_share,
+            'revenue_per_share': self.revenue_per_share,
+            'earnings_per_share': self.earnings_per_share,
+            'roe': self.roe,
+            'debt_to_equity': self.debt_to_equity,
+            'profit_margin': self.profit_margin,
+            'revenue_growth': self.revenue_growth,
+        }
+    
+    def to_tuple(self) -> Tuple[Optional[float], ...]:
+        """Peer statistics inputs in matrix column order: PE, PB, PS, ROE, D/E"""
+        return (self.pe_ratio, self.pb_ratio, self.ps_ratio, self.roe, self.debt_to_equity)
 
-@dataclass
+@dataclass(slots=True)
 class ValuationResult:
     """Result of stock valuation analysis with calculated value price"""
     ticker: str
@@ -66,48 +105,108 @@ class ValuationResult:
     dcf_price: float
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Shallow: nested dicts are shared rather than deep-copied by asdict(), and every value is already JSON-ready
+        return {
+            'ticker': self.ticker,
+            'full_name': self.full_name,
+            'analysis_date': self.analysis_date,
+            'current_price': self.current_price,
+            'calculated_value_price': self.calculated_value_price,
+            'price_difference': self.price_difference,
+            'price_difference_percent': self.price_difference_percent,
+            'valuation_method': self.valuation_method,
+            'target_metrics': self.target_metrics,
+            'peer_tickers': self.peer_tickers,
+            'peer_count': self.peer_count,
+            'peer_statistics': self.peer_statistics,
+            'valuation_components': self.valuation_components,
+            'key_insights': self.key_insights,
+            'dcf_price': self.dcf_price,
+        }
 
 class CachedStockData:
-    """Simple in-memory cache for stock data"""
+    """In-memory cache for stock data, optionally backed by a disk cache that survives restarts"""
     
-    def __init__(self, cache_duration_minutes: int = 30):
+    EVICTION_INTERVAL = timedelta(minutes=10)
+    
+    def __init__(self, cache_duration_minutes: int = 30, disk_cache: Optional[DiskCache] = None):
         self.cache = {}
         self.cache_duration = timedelta(minutes=cache_duration_minutes)
+        self._lock = threading.Lock()  # Batch fetches read and write from worker threads
+        self._disk_cache = disk_cache
+        self._last_eviction = datetime.now()
     
     def get(self, ticker: str) -> Optional[EssentialMetrics]:
         """Get cached data if valid"""
-        if ticker in self.cache:
-            data, timestamp = self.cache[ticker]
-            if datetime.now() - timestamp < self.cache_duration:
-                return data
-            else:
-                del self.cache[ticker]  # Remove expired cache
-        return None
+        with self._lock:
+            if ticker in self.cache:
+                data, timestamp = self.cache[ticker]
+                if datetime.now() - timestamp < self.cache_duration:
+                    return data
+                else:
+                    del self.cache[ticker]  # Remove expired cache
+        
+        return self._get_from_disk(ticker) if self._disk_cache else None
     
     def set(self, ticker: str, data: EssentialMetrics):
         """Cache data with timestamp"""
-        self.cache[ticker] = (data, datetime.now())
+        timestamp = datetime.now()
+        with self._lock:
+            self.cache[ticker] = (data, timestamp)
+        
+        if self._disk_cache:
+            self._disk_cache.set(
+                make_key("metrics", ticker),
+                {"cached_at": timestamp.timestamp(), "metrics": data.to_dict()},
+                self.cache_duration.total_seconds(),
+            )
+            if timestamp - self._last_eviction > self.EVICTION_INTERVAL:
+                self._last_eviction = timestamp
+                self._disk_cache.evict_expired()
+    
+    def _get_from_disk(self, ticker: str) -> Optional[EssentialMetrics]:
+        """Load an entry from disk into memory, keeping its original timestamp"""
+        entry = self._disk_cache.get(make_key("metrics", ticker))
+        if entry is None:
+            return None
+        try:
+            data = EssentialMetrics(**entry["metrics"])
+        except (KeyError, TypeError):
+            return None  # Written by an older EssentialMetrics layout
+        with self._lock:
+            self.cache[ticker] = (data, datetime.fromtimestamp(entry["cached_at"]))
+        return data
+    
+    def missing(self, tickers: List[str]) -> List[str]:
+        """Tickers without a valid cache entry"""
+        return [ticker for ticker in tickers if not self.get(ticker)]
     
     def clear(self):
         """Clear all cached data"""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+        if self._disk_cache:
+            self._disk_cache.clear()
 
 class OptimizedStockDataService:
     """Optimized service with minimal API calls"""
     
-    def __init__(self, cache_duration_minutes: int = 30):
-        self.cache = CachedStockData(cache_duration_minutes)
-        self.rate_limit_delay = 0.1  # 100ms between calls
-        self.last_call_time = 0
+    UNKNOWN_SYMBOL_TTL = timedelta(minutes=15)  # How long a symbol missing from a batch quote stays skipped
+    
+    def __init__(self, cache_duration_minutes: int = 30, disk_cache: Optional[DiskCache] = None,
+                 requests_per_second: float = 5, burst: int = 10):
+        self.cache = CachedStockData(cache_duration_minutes, disk_cache)
+        self._bucket = TokenBucket(rate=requests_per_second, capacity=burst)  # Stays under Yahoo's 429 threshold
+        self.max_workers = 8  # Concurrent Yahoo fetches in get_batch_metrics
+        self._async_semaphore = asyncio.Semaphore(16)  # Concurrent fetches in the async methods
+        self._unknown_symbols: Dict[str, datetime] = {}  # Symbols the batch quote left out, with when
+        self._unknown_lock = threading.Lock()
+        # Per-instance memo of confirmed tickers, so lookups still go through this instance's rate limiter
+        self._is_valid_ticker = lru_cache(maxsize=4096)(self._check_ticker)
     
     def _rate_limit(self):
-        """Simple rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_call_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        self.last_call_time = time.time()
+        """Wait for a token from the shared Yahoo rate limiter"""
+        self._bucket.acquire()
     
     def get_essential_metrics(self, ticker: str) -> EssentialMetrics:
         """Get only essential metrics with caching"""
@@ -122,14 +221,15 @@ class OptimizedStockDataService:
         
         try:
             logger.info(f"Fetching fresh data for {ticker}")
-            stock = yf.Ticker(ticker)
+            stock = get_ticker(ticker)  # Shared session keeps Yahoo connections warm
             
-            # Get only info (most efficient single call)
-            info = stock.info
+            # Get only info (most efficient single call); transient failures are retried
+            info = fetch_info(stock)
             
             metrics = EssentialMetrics(ticker=ticker.upper())
             
             # Extract only essential data
+            metrics.full_name = info.get('longName')
             metrics.market_cap = info.get('marketCap')
             metrics.pe_ratio = info.get('trailingPE')
             metrics.pb_ratio = info.get('priceToBook')
@@ -148,6 +248,7 @@ class OptimizedStockDataService:
             return metrics
             
         except Exception as e:
+            # Not cached, so a later request retries instead of reusing the empty result
             logger.error(f"Error fetching metrics for {ticker}: {e}")
             return EssentialMetrics(ticker=ticker.upper())
     
@@ -156,55 +257,250 @@ class OptimizedStockDataService:
         results = []
         uncached_tickers = []
         
-        # First pass: collect cached data and identify what needs fetching
-        for ticker in tickers:
+        # First pass: collect cached data and identify what needs fetching; duplicates are looked up once
+        for ticker in dict.fromkeys(tickers):
             cached_data = self.cache.get(ticker)
             if cached_data:
                 results.append((ticker, cached_data))
             else:
                 uncached_tickers.append(ticker)
         
-        # Second pass: fetch uncached data with rate limiting
+        # One multi-symbol quote call tells us which symbols Yahoo knows about
+        unknown = self._screen_unknown(uncached_tickers)
+        
+        to_fetch = []
         for ticker in uncached_tickers:
-            metrics = self.get_essential_metrics(ticker)
-            results.append((ticker, metrics))
+            if ticker in unknown:
+                # Unknown symbol (common with AI-suggested peers), skip the per-ticker fetch
+                logger.info(f"Skipping {ticker}: not found in batch quote")
+                results.append((ticker, EssentialMetrics(ticker=ticker.upper())))
+            else:
+                to_fetch.append(ticker)
+        
+        # Second pass: fetch uncached data concurrently; the rate limiter still spaces out request starts
+        results.extend(zip(to_fetch, self.get_essential_metrics_many(to_fetch)))
         
         # Sort results to match original order
         ticker_to_metrics = dict(results)
         return [ticker_to_metrics[ticker] for ticker in tickers if ticker in ticker_to_metrics]
     
+    def get_essential_metrics_many(self, tickers: List[str]) -> List[EssentialMetrics]:
+        """Fetch metrics for several tickers concurrently, in input order; a failed ticker gets empty metrics"""
+        if not tickers:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers))) as executor:
+            futures = [executor.submit(self.get_essential_metrics, ticker) for ticker in tickers]
+        
+        results = []
+        for ticker, future in zip(tickers, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # One bad peer shouldn't sink the batch; callers already skip peers without data
+                logger.error(f"Error fetching metrics for {ticker}: {e}")
+                results.append(EssentialMetrics(ticker=ticker.upper()))
+        return results
+    
+    async def aget_essential_metrics(self, ticker: str) -> EssentialMetrics:
+        """Async variant of get_essential_metrics; yfinance and the disk cache block, so both run in a thread"""
+        cached_data = await asyncio.to_thread(self.cache.get, ticker)
+        if cached_data:
+            return cached_data
+        
+        async with self._async_semaphore:
+            return await asyncio.to_thread(self.get_essential_metrics, ticker)
+    
+    async def aget_batch_metrics(self, tickers: List[str]) -> List[EssentialMetrics]:
+        """Async variant of get_batch_metrics that overlaps all fetches on the event loop"""
+        unique_tickers = list(dict.fromkeys(tickers))
+        uncached_tickers = await asyncio.to_thread(self.cache.missing, unique_tickers)
+        
+        # One multi-symbol quote request screens out unknown symbols before the per-ticker fan-out
+        unknown = await asyncio.to_thread(self._screen_unknown, uncached_tickers)
+        
+        async def fetch(ticker: str) -> EssentialMetrics:
+            if ticker in unknown:
+                logger.info(f"Skipping {ticker}: not found in batch quote")
+                return EssentialMetrics(ticker=ticker.upper())
+            return await self.aget_essential_metrics(ticker)
+        
+        fetched = await asyncio.gather(*(fetch(t) for t in unique_tickers))
+        ticker_to_metrics = dict(zip(unique_tickers, fetched))
+        return [ticker_to_metrics[ticker] for ticker in tickers]
+    
+    def _screen_unknown(self, tickers: List[str]) -> set:
+        """Tickers Yahoo doesn't know, from recent screens or one batch quote for the rest"""
+        unknown = {ticker for ticker in tickers if self.is_unknown_symbol(ticker)}
+        to_quote = [ticker for ticker in tickers if ticker not in unknown]
+        known_symbols = self._fetch_known_symbols(to_quote)
+        if known_symbols is None:
+            return unknown
+        
+        newly_unknown = {ticker for ticker in to_quote if ticker.upper() not in known_symbols}
+        now = datetime.now()
+        with self._unknown_lock:
+            # Drop expired entries while we hold the lock so the map stays small
+            for symbol, seen in list(self._unknown_symbols.items()):
+                if now - seen >= self.UNKNOWN_SYMBOL_TTL:
+                    del self._unknown_symbols[symbol]
+            for ticker in newly_unknown:
+                self._unknown_symbols[ticker.upper()] = now
+        return unknown | newly_unknown
+    
+    def is_unknown_symbol(self, ticker: str) -> bool:
+        """Whether a recent batch quote left this symbol out, so fetching it would be wasted"""
+        with self._unknown_lock:
+            seen = self._unknown_symbols.get(ticker.upper())
+        return seen is not None and datetime.now() - seen < self.UNKNOWN_SYMBOL_TTL
+    
+    def _fetch_known_symbols(self, tickers: List[str]) -> Optional[set]:
+        """Symbols present in Yahoo's batch quote response, or None if the batch call failed"""
+        if not tickers:
+            return None
+        try:
+            self._rate_limit()
+            quotes = fetch_quotes(tickers)
+        except Exception as e:
+            logger.warning(f"Batch quote lookup failed, fetching tickers individually: {e}")
+            return None
+        # An empty answer is more likely an endpoint problem than every symbol being invalid
+        return set(quotes) if quotes else None
+    
     def validate_ticker_fast(self, ticker: str) -> bool:
         """Fast ticker validation using cached data or minimal call"""
+        if not is_valid_ticker_format(ticker):
+            return False
+        
         cached_data = self.cache.get(ticker)
         if cached_data:
             return cached_data.market_cap is not None
         
         try:
-            self._rate_limit()
-            stock = yf.Ticker(ticker)
-            # Use fast_info for quick validation (lighter API call)
-            fast_info = stock.fast_info
-            market_cap = fast_info.get('marketCap')
-            return market_cap is not None and market_cap > 0
-        except:
+            return self._is_valid_ticker(ticker.strip().upper())
+        except Exception as e:
+            # Rejections and failures raise, so they aren't memoized and the next call asks Yahoo again
+            logger.info(f"Ticker validation failed for {ticker}: {e}")
             return False
+    
+    def _check_ticker(self, ticker: str) -> bool:
+        """Ask Yahoo whether a ticker exists; only a confirmed ticker returns, so only True is memoized"""
+        self._rate_limit()
+        stock = get_ticker(ticker)
+        # Use fast_info for quick validation (lighter API call)
+        market_cap = stock.fast_info.get('marketCap')
+        if market_cap is None or market_cap <= 0:
+            raise LookupError(f"No market cap for {ticker}")
+        return True
+    
+    def clear_validation_cache(self):
+        """Forget memoized ticker validation results"""
+        self._is_valid_ticker.cache_clear()
+        with self._unknown_lock:
+            self._unknown_symbols.clear()
 
 class PeerCompanyService:
     """Service for finding peer companies with static fallbacks"""
     
-    def __init__(self, ai_client: Optional[genai.Client] = None):
+    def __init__(self, ai_client: Optional[genai.Client] = None, cache_duration_minutes: int = 24 * 60,
+                 disk_cache: Optional[DiskCache] = None, max_cache_entries: int = 1024):
         self.ai_client = ai_client
         self._static_peers = self._load_static_peers()
-        self._peer_cache = {}  # Cache AI results
+        # Bounded LRU of AI results with timestamps; oldest entries sit at the front
+        self._peer_cache: OrderedDict = OrderedDict()
+        self._peer_cache_hits: Counter = Counter()
+        self._peer_cache_accessed: set = set()  # Keys read since they were last stored
+        self._peer_cache_lock = threading.Lock()
+        self._peer_cache_duration = timedelta(minutes=cache_duration_minutes)
+        self._max_cache_entries = max_cache_entries
+        self._disk_cache = disk_cache  # Persists AI responses across restarts
+        # In-flight AI lookups, so concurrent callers for the same key share one request
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._inflight_async: Dict[str, asyncio.Task] = {}
+    
+    def _get_cached_peers(self, cache_key: str) -> Optional[List[str]]:
+        """Get cached peers if still valid"""
+        with self._peer_cache_lock:
+            if cache_key in self._peer_cache:
+                peers, timestamp = self._peer_cache[cache_key]
+                if datetime.now() - timestamp < self._peer_cache_duration:
+                    self._peer_cache.move_to_end(cache_key)
+                    self._peer_cache_hits[cache_key] += 1
+                    self._peer_cache_accessed.add(cache_key)
+                    return peers
+                # Remove expired cache
+                del self._peer_cache[cache_key]
+                del self._peer_cache_hits[cache_key]
+                self._peer_cache_accessed.discard(cache_key)
+        return None
+    
+    def _store_peers(self, cache_key: str, peers: List[str]):
+        """Insert into the in-memory LRU, evicting when full"""
+        with self._peer_cache_lock:
+            if cache_key not in self._peer_cache and len(self._peer_cache) >= self._max_cache_entries:
+                # Among the least recently used 10%, evict the entry with the fewest hits
+                candidates = islice(self._peer_cache, max(1, self._max_cache_entries // 10))
+                victim = min(candidates, key=lambda key: self._peer_cache_hits[key])
+                del self._peer_cache[victim]
+                del self._peer_cache_hits[victim]
+                self._peer_cache_accessed.discard(victim)
+            self._peer_cache[cache_key] = (peers, datetime.now())
+            self._peer_cache_accessed.discard(cache_key)
+            self._peer_cache.move_to_end(cache_key)
+    
+    def _cache_peers(self, cache_key: str, peers: List[str]):
+        """Cache peers with timestamp"""
+        self._store_peers(cache_key, peers)
+    
+    def _load_ai_response(self, request: Dict[str, Any]) -> Optional[Any]:
+        """Previously stored result for an identical AI request, if any"""
+        return self._disk_cache.get(request_cache_key(request)) if self._disk_cache else None
+    
+    def _save_ai_response(self, request: Dict[str, Any], result: Any):
+        """Store an AI result keyed by the request content"""
+        if self._disk_cache:
+            self._disk_cache.set(request_cache_key(request), result, AI_CACHE_TTL_SECONDS)
+    
+    def refresh_expiring_peers(self, fraction: float = 0.1) -> int:
+        """Re-resolve AI peer lists in the last `fraction` of their TTL so requests never wait on the AI"""
+        if not self.ai_client:
+            return 0
+        threshold = datetime.now() - self._peer_cache_duration * (1 - fraction)
+        with self._peer_cache_lock:
+            # Only entries read since they were stored; unused ones are left to expire
+            expiring = [key for key, (_, timestamp) in self._peer_cache.items()
+                        if timestamp <= threshold and key in self._peer_cache_accessed]
+        
+        refreshed = 0
+        for cache_key in expiring:
+            ticker, num_peers = cache_key.rsplit("_", 1)
+            if len(self._static_peers.get(ticker, [])) >= int(num_peers):
+                continue  # Static peers never expire in substance
+            try:
+                peers = self._get_ai_peers(ticker, int(num_peers))
+            except Exception as e:
+                logger.warning(f"Peer refresh failed for {ticker}, keeping cached peers: {e}")
+                continue
+            self._cache_peers(cache_key, peers)
+            refreshed += 1
+        return refreshed
+    
+    def get_cached_peers(self, ticker: str, num_peers: int = 8) -> Optional[List[str]]:
+        """Peers from the in-memory cache only; None if they would need a lookup"""
+        return self._get_cached_peers(f"{ticker.upper()}_{num_peers}")
     
     def get_peers(self, ticker: str, num_peers: int = 8) -> List[str]:
         """Get peer companies with proper handling of requested count"""
+        if not is_valid_ticker_format(ticker):
+            raise ValueError(f"Invalid ticker: {ticker}")
         ticker_upper = ticker.upper()
         
         # Check cache for AI results first (gives us more flexibility)
         cache_key = f"{ticker_upper}_{num_peers}"
-        if cache_key in self._peer_cache:
-            return self._peer_cache[cache_key]
+        cached_peers = self._get_cached_peers(cache_key)
+        if cached_peers is not None:
+            return cached_peers
         
         # Try static peers first but supplement with AI if we need more
         static_peers = self._static_peers.get(ticker_upper, [])
@@ -212,44 +508,231 @@ class PeerCompanyService:
         if len(static_peers) >= num_peers:
             # Static peers are sufficient
             peers = static_peers[:num_peers]
-            self._peer_cache[cache_key] = peers
+            self._cache_peers(cache_key, peers)
             return peers
         
         # Need more peers - use AI if available
         if self.ai_client:
-            try:
-                peers = self._get_ai_peers(ticker, num_peers)
-                self._peer_cache[cache_key] = peers  # Cache with specific count
-                return peers
-            except Exception as e:
-                logger.error(f"AI peer detection failed: {e}")
-                # Fallback to static peers even if fewer than requested
-                peers = static_peers if static_peers else ['SPY']
-                self._peer_cache[cache_key] = peers
-                return peers
+            return self._get_ai_peers_single_flight(cache_key, ticker_upper, num_peers, static_peers)
         
         # Ultimate fallback - return what we have from static
         peers = static_peers if static_peers else ['SPY']
-        self._peer_cache[cache_key] = peers
+        self._cache_peers(cache_key, peers)
         return peers
     
-    def _get_ai_peers(self, ticker: str, num_peers: int) -> List[str]:
-        """Get peers using AI (cached)"""
-        prompt = f'List {num_peers} similar stock tickers to {ticker}. Same industry, similar size. US exchanges only.\n'
-        'Example: 10, AAPL'
-        
-        response = self.ai_client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config={
-                "temperature": 0.05,
+    async def get_peers_async(self, ticker: str, num_peers: int = 8) -> List[str]:
+        """Async variant of get_peers that does not block the event loop on the AI call"""
+        if not is_valid_ticker_format(ticker):
+            raise ValueError(f"Invalid ticker: {ticker}")
+        ticker_upper = ticker.upper()
+        
+        cache_key = f"{ticker_upper}_{num_peers}"
+        cached_peers = self._get_cached_peers(cache_key)
+        if cached_peers is not None:
+            return cached_peers
+        
+        static_peers = self._static_peers.get(ticker_upper, [])
+        if len(static_peers) >= num_peers or not self.ai_client:
+            # No AI call needed, the sync path only touches memory
+            return self.get_peers(ticker, num_peers)
+        
+        task = self._inflight_async.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve_ai_peers_async(cache_key, ticker_upper, num_peers, static_peers))
+            self._inflight_async[cache_key] = task
+            task.add_done_callback(lambda done: self._inflight_async.pop(cache_key, None))
+        # Shield so one cancelled caller does not cancel the lookup others are waiting on
+        return await asyncio.shield(task)
+    
+    def _get_ai_peers_single_flight(self, cache_key: str, ticker: str, num_peers: int,
+                                    static_peers: List[str]) -> List[str]:
+        """Run one AI lookup per cache key; concurrent callers wait for its result"""
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            if future is None:
+                # Another thread may have finished the lookup since our cache check
+                cached_peers = self._get_cached_peers(cache_key)
+                if cached_peers is not None:
+                    return cached_peers
+                future = Future()
+                self._inflight[cache_key] = future
+                is_owner = True
+            else:
+                is_owner = False
+        
+        if not is_owner:
+            return future.result()
+        
+        # Fallback to static peers even if fewer than requested
+        peers = static_peers if static_peers else ['SPY']
+        try:
+            peers = self._get_ai_peers(ticker, num_peers)
+        except Exception as e:
+            logger.error(f"AI peer detection failed: {e}")
+        finally:
+            self._cache_peers(cache_key, peers)  # Cache with specific count
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+            future.set_result(peers)
+        return peers
+    
+    async def _resolve_ai_peers_async(self, cache_key: str, ticker: str, num_peers: int,
+                                      static_peers: List[str]) -> List[str]:
+        """Async counterpart of the single-flight AI lookup"""
+        try:
+            peers = await self._get_ai_peers_async(ticker, num_peers)
+        except Exception as e:
+            logger.error(f"AI peer detection failed: {e}")
+            peers = static_peers if static_peers else ['SPY']
+        self._cache_peers(cache_key, peers)
+        return peers
+    
+    async def get_peers_batch_async(self, tickers: List[str], num_peers: int = 8) -> Dict[str, List[str]]:
+        """Get peers for several tickers with the AI calls running concurrently"""
+        results = await asyncio.gather(*(self.get_peers_async(t, num_peers) for t in tickers))
+        return dict(zip(tickers, results))
+    
+    def get_peers_bulk(self, tickers: List[str], num_peers: int = 8) -> Dict[str, List[str]]:
+        """Get peers for several tickers, resolving all cache misses with a single AI call"""
+        results = {}
+        missing = []
+        for ticker in dict.fromkeys(t.upper() for t in tickers):
+            if not is_valid_ticker_format(ticker):
+                raise ValueError(f"Invalid ticker: {ticker}")
+            cached_peers = self._get_cached_peers(f"{ticker}_{num_peers}")
+            if cached_peers is not None:
+                results[ticker] = cached_peers
+            elif self.ai_client and len(self._static_peers.get(ticker, [])) < num_peers:
+                missing.append(ticker)
+            else:
+                results[ticker] = self.get_peers(ticker, num_peers)  # Memory-only path
+        
+        if len(missing) > 1:
+            try:
+                bulk_peers = self._get_ai_peers_bulk(missing, num_peers)
+                for ticker, peers in bulk_peers.items():
+                    self._cache_peers(f"{ticker}_{num_peers}", peers)
+                    results[ticker] = peers
+            except Exception as e:
+                logger.error(f"Bulk AI peer detection failed: {e}")
+        
+        # Anything the bulk call skipped goes through the single-ticker path
+        for ticker in missing:
+            if ticker not in results:
+                results[ticker] = self.get_peers(ticker, num_peers)
+        
+        return {t: results[t.upper()] for t in tickers}
+    
+    def _get_ai_peers_bulk(self, tickers: List[str], num_peers: int) -> Dict[str, List[str]]:
+        """Get peers for many tickers in one AI round trip"""
+        prompt = (f'For each of these stock tickers: {", ".join(tickers)}, list {num_peers} stock tickers '
+                  'of companies similar to it. Same industry, similar size. US exchanges only. '
+                  'Return ticker symbols only.')
+        
+        request = {
+            "model": "gemini-2.5-flash",
+            "contents": prompt,
+            "config": {
+                "temperature": 0,
+                "thinking_config": {"thinking_budget": 0},
+                "max_output_tokens": (16 * num_peers + 64) * len(tickers),
                 "response_mime_type": "application/json",
-                "response_schema": list[str],
+                "response_schema": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "ticker": {"type": "string"},
+                            "peers": {
+                                "type": "array",
+                                "items": {"type": "string", "maxLength": 10},
+                                "maxItems": num_peers + 1,
+                            },
+                        },
+                        "required": ["ticker", "peers"],
+                    },
+                },
             },
-        )
+        }
+        cached = self._load_ai_response(request)
+        if cached is not None:
+            return cached
+        
+        response = self._generate_content(request)
         
-        peer_companies = response.parsed
-        return [p for p in peer_companies if p.upper() != ticker.upper()][:num_peers]
+        requested = set(tickers)
+        bulk_peers = {}
+        for entry in response.parsed or []:
+            ticker = str(entry.get("ticker", "")).strip().upper()
+            if ticker in requested:
+                bulk_peers[ticker] = self._clean_ai_peers(ticker, entry.get("peers"), num_peers)
+        self._save_ai_response(request, bulk_peers)
+        return bulk_peers
+    
+    def _ai_peer_request(self, ticker: str, num_peers: int) -> Dict[str, Any]:
+        """Build the Gemini request for a peer lookup"""
+        prompt = (f'List {num_peers} stock tickers of companies similar to {ticker}. '
+                  'Same industry, similar size. US exchanges only. Return ticker symbols only.')
+        
+        return {
+            "model": "gemini-2.5-flash",
+            "contents": prompt,
+            "config": {
+                "temperature": 0,
+                # Output is a short list of symbols, so skip thinking and cap the decode
+                "thinking_config": {"thinking_budget": 0},
+                "max_output_tokens": 16 * num_peers + 64,
+                "response_mime_type": "application/json",
+                "response_schema": {
+                    "type": "array",
+                    "items": {"type": "string", "maxLength": 10},
+                    "maxItems": num_peers + 1,  # Room for the target itself, which is filtered out
+                },
+            },
+        }
+    
+    @retry_transient(AI_TRANSIENT_ERRORS, retry_if=is_transient_error)
+    def _generate_content(self, request: Dict[str, Any]):
+        """Call Gemini, retrying rate limits, server errors and network failures"""
+        return self.ai_client.models.generate_content(**request)
+    
+    @async_retry_transient(AI_TRANSIENT_ERRORS, retry_if=is_transient_error)
+    async def _agenerate_content(self, request: Dict[str, Any]):
+        """Async variant of _generate_content"""
+        return await self.ai_client.aio.models.generate_content(**request)
+    
+    def _get_ai_peers(self, ticker: str, num_peers: int) -> List[str]:
+        """Get peers using AI (cached)"""
+        request = self._ai_peer_request(ticker, num_peers)
+        cached = self._load_ai_response(request)
+        if cached is not None:
+            return cached
+        
+        response = self._generate_content(request)
+        
+        peers = self._clean_ai_peers(ticker, response.parsed, num_peers)
+        self._save_ai_response(request, peers)
+        return peers
+    
+    def _clean_ai_peers(self, ticker: str, peer_companies: List[str], num_peers: int) -> List[str]:
+        """Normalize AI peers to upper case, drop duplicates and the target itself"""
+        ticker_upper = ticker.upper()
+        # dict.fromkeys dedupes while keeping the model's ranking order
+        unique_peers = dict.fromkeys(p.strip().upper() for p in peer_companies or [])
+        return [p for p in unique_peers if p and p != ticker_upper][:num_peers]
+    
+    async def _get_ai_peers_async(self, ticker: str, num_peers: int) -> List[str]:
+        """Get peers using the async AI client"""
+        request = self._ai_peer_request(ticker, num_peers)
+        cached = self._load_ai_response(request)
+        if cached is not None:
+            return cached
+        
+        response = await self._agenerate_content(request)
+        
+        peers = self._clean_ai_peers(ticker, response.parsed, num_peers)
+        self._save_ai_response(request, peers)
+        return peers
     
     def _load_static_peers(self) -> Dict[str, List[str]]:
         """Expanded static peer mappings with more peers per company"""
@@ -257,155 +740,147 @@ class PeerCompanyService:
             # Add your static peers here if needed
         }
 
+def nan_quantiles(mat: np.ndarray, quantiles: Tuple[float, ...]) -> np.ndarray:
+    """Per-column quantiles ignoring NaN, matching np.nanquantile's linear method; shape (len(quantiles), n_columns)"""
+    # One sort for every column and quantile; NaNs sort to the end of each column
+    ordered = np.sort(mat, axis=0)
+    counts = np.sum(~np.isnan(mat), axis=0)
+    
+    positions = np.asarray(quantiles)[:, None] * np.maximum(counts - 1, 0)
+    below = np.floor(positions).astype(np.intp)
+    above = np.minimum(below + 1, np.maximum(counts - 1, 0))
+    low = np.take_along_axis(ordered, below, axis=0)
+    high = np.take_along_axis(ordered, above, axis=0)
+    
+    # Same lerp as NumPy, which interpolates from the nearer end for stability
+    frac = positions - below
+    diff = high - low
+    result = np.where(frac >= 0.5, high - diff * (1 - frac), low + diff * frac)
+    return np.where(counts > 0, result, np.nan)
+
+def quality_multiplier(roe: float, roe_median: float, roe_std: float,
+                       de: float, de_median: float, de_std: float) -> float:
+    """Quality multiplier from ROE and D/E z-scores; pure float math, NaN inputs mean no data"""
+    total_adjustment = 0.0
+    count = 0
+    
+    if not math.isnan(roe) and roe_std > 0:
+        # Calculate z-score and convert to adjustment factor
+        roe_z_score = (roe - roe_median) / roe_std
+        # More conservative adjustment: cap between -15% and +15%
+        total_adjustment += max(-0.15, min(0.15, roe_z_score * 0.05))
+        count += 1
+    
+    if not math.isnan(de) and de_std > 0:
+        # Calculate z-score (inverted because lower D/E is better)
+        de_z_score = (de_median - de) / de_std
+        # More conservative adjustment: cap between -10% and +10%
+        total_adjustment += max(-0.10, min(0.10, de_z_score * 0.04))
+        count += 1
+    
+    if count == 0:
+        return 1.0  # No adjustment if no quality metrics available
+    
+    # Average the adjustments, then a final safety cap of ±20%
+    return 1.0 + max(-0.20, min(0.20, total_adjustment / count))
+
 class ValuePriceCalculationService:
     """Service for calculating intrinsic value price using peer multiples and quality adjustments"""
     
+    # Reasonable (lower, upper) bounds applied after outlier removal
+    STAT_BOUNDS = {
+        'pe_ratio': (-np.inf, 100.0),       # Cap PE at 100
+        'pb_ratio': (-np.inf, 20.0),        # Cap PB at 20
+        'ps_ratio': (-np.inf, 30.0),        # Cap PS at 30
+        'roe': (-0.5, 1.0),                 # -50% to 100%
+        'debt_to_equity': (-np.inf, 10.0),  # Cap D/E at 10
+    }
+    
+    # Multiple-based valuations: (peer stat, target per-share metric, reasonable median range, output key, label)
+    VAL_SPECS = (
+        ('pe_ratio', 'earnings_per_share', 5, 100, 'pe_valuation', 'PE'),
+        ('pb_ratio', 'book_value_per_share', 0.1, 20, 'pb_valuation', 'PB'),
+        ('ps_ratio', 'revenue_per_share', 0.1, 30, 'ps_valuation', 'PS'),
+    )
+    
     def __init__(self):
         self.valuation_methods = ['pe_ratio', 'pb_ratio', 'ps_ratio']
         self.quality_metrics = ['roe', 'debt_to_equity']
+        columns = self.valuation_methods + self.quality_metrics
+        self._lower_bounds, self._upper_bounds = np.array([self.STAT_BOUNDS[col] for col in columns]).T
+        self._min_multiples, self._max_multiples = np.array([spec[2:4] for spec in self.VAL_SPECS], dtype=np.float64).T
     
-    def _remove_outliers(self, series: pd.Series, method: str = 'iqr') -> pd.Series:
-        """Remove extreme outliers from peer data"""
-        if len(series) < 3:
-            return series
-        
+    def _outlier_mask(self, mat: np.ndarray, method: str = 'iqr') -> np.ndarray:
+        """Boolean mask of non-outlier values, computed for every peer column at once"""
         if method == 'iqr':
-            Q1 = series.quantile(0.25)
-            Q3 = series.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 2.0 * IQR  # More conservative than 1.5
-            upper_bound = Q3 + 2.0 * IQR
-            return series[(series >= lower_bound) & (series <= upper_bound)]
+            q1, q3 = nan_quantiles(mat, (0.25, 0.75))
+            iqr = q3 - q1
+            lower_bound = q1 - 2.0 * iqr  # More conservative than 1.5
+            upper_bound = q3 + 2.0 * iqr
+            return (mat >= lower_bound) & (mat <= upper_bound)
         
         elif method == 'zscore':
-            z_scores = np.abs((series - series.mean()) / series.std())
-            return series[z_scores < 2.5]  # Remove values >2.5 std devs
+            z_scores = np.abs((mat - np.nanmean(mat, axis=0)) / np.nanstd(mat, axis=0, ddof=1))
+            return z_scores < 2.5  # Remove values >2.5 std devs
         
-        return series
+        return ~np.isnan(mat)
 
     def calculate_peer_statistics(self, peer_metrics: List[EssentialMetrics]) -> Dict[str, Dict[str, float]]:
         """Calculate statistics for valuation multiples and quality metrics with outlier removal"""
         if not peer_metrics:
             return {}
         
-        df = pd.DataFrame([m.to_dict() for m in peer_metrics])
-        stats = {}
+        columns = self.valuation_methods + self.quality_metrics
+        # Structure-of-arrays: one (n_peers, n_columns) matrix with missing values as NaN
+        mat = np.array([m.to_tuple() for m in peer_metrics], dtype=np.float64)
+        counts = np.sum(~np.isnan(mat), axis=0)
+        filtered = counts > 2  # Need at least 3 points for outlier removal; smaller columns are used as-is
+        
+        # Outlier fences and reasonable bounds fused into one keep-mask, so the matrix is copied once
+        keep = self._outlier_mask(mat, method='iqr') & (mat >= self._lower_bounds) & (mat <= self._upper_bounds)
+        clean = np.where(filtered & ~keep, np.nan, mat)
         
-        # Calculate stats for valuation multiples with outlier removal
-        for col in self.valuation_methods:
-            if col in df.columns:
-                series = df[col].dropna()
-                if len(series) > 2:  # Need at least 3 points for outlier removal
-                    # Remove outliers
-                    clean_series = self._remove_outliers(series, method='iqr')
-                    
-                    # Ensure we still have enough data points
-                    if len(clean_series) >= 2:
-                        # Apply reasonable caps for extreme multiples
-                        if col == 'pe_ratio':
-                            clean_series = clean_series[clean_series <= 100]  # Cap PE at 100
-                        elif col == 'pb_ratio':
-                            clean_series = clean_series[clean_series <= 20]   # Cap PB at 20
-                        elif col == 'ps_ratio':
-                            clean_series = clean_series[clean_series <= 30]   # Cap PS at 30
-                        
-                        if len(clean_series) >= 2:
-                            stats[col] = {
-                                'median': float(clean_series.median()),
-                                'mean': float(clean_series.mean()),
-                                '25th_percentile': float(clean_series.quantile(0.25)),
-                                '75th_percentile': float(clean_series.quantile(0.75)),
-                                'std': float(clean_series.std()) if clean_series.std() > 0 else 0.0,
-                                'count': int(len(clean_series)),
-                                'outliers_removed': int(len(series) - len(clean_series))
-                            }
-                elif len(series) >= 2:  # Fallback for small datasets
-                    stats[col] = {
-                        'median': float(series.median()),
-                        'mean': float(series.mean()),
-                        '25th_percentile': float(series.quantile(0.25)),
-                        '75th_percentile': float(series.quantile(0.75)),
-                        'std': float(series.std()) if series.std() > 0 else 0.0,
-                        'count': int(len(series)),
-                        'outliers_removed': 0
-                    }
-        
-        # Calculate stats for quality metrics (ROE and D/E) with outlier removal
-        for col in self.quality_metrics:
-            if col in df.columns:
-                series = df[col].dropna()
-                if len(series) > 2:
-                    clean_series = self._remove_outliers(series, method='iqr')
-                    
-                    # Apply reasonable bounds
-                    if col == 'roe':
-                        clean_series = clean_series[(clean_series >= -0.5) & (clean_series <= 1.0)]  # -50% to 100%
-                    elif col == 'debt_to_equity':
-                        clean_series = clean_series[clean_series <= 10.0]  # Cap D/E at 10
-                    
-                    if len(clean_series) >= 2:
-                        stats[col] = {
-                            'median': float(clean_series.median()),
-                            'mean': float(clean_series.mean()),
-                            '25th_percentile': float(clean_series.quantile(0.25)),
-                            '75th_percentile': float(clean_series.quantile(0.75)),
-                            'std': float(clean_series.std()) if clean_series.std() > 0 else 0.0,
-                            'count': int(len(clean_series)),
-                            'outliers_removed': int(len(series) - len(clean_series))
-                        }
-                elif len(series) >= 2:
-                    stats[col] = {
-                        'median': float(series.median()),
-                        'mean': float(series.mean()),
-                        '25th_percentile': float(series.quantile(0.25)),
-                        '75th_percentile': float(series.quantile(0.75)),
-                        'std': float(series.std()) if series.std() > 0 else 0.0,
-                        'count': int(len(series)),
-                        'outliers_removed': 0
-                    }
+        clean_counts = np.sum(~np.isnan(clean), axis=0)
+        q25, median, q75 = nan_quantiles(clean, (0.25, 0.5, 0.75))
+        means = np.nanmean(clean, axis=0)
+        stds = np.nanstd(clean, axis=0, ddof=1)
+        
+        stats = {}
+        for i, col in enumerate(columns):
+            if clean_counts[i] >= 2:  # Ensure we still have enough data points
+                stats[col] = {
+                    'median': float(median[i]),
+                    'mean': float(means[i]),
+                    '25th_percentile': float(q25[i]),
+                    '75th_percentile': float(q75[i]),
+                    'std': float(stds[i]) if stds[i] > 0 else 0.0,
+                    'count': int(clean_counts[i]),
+                    'outliers_removed': int(counts[i] - clean_counts[i])
+                }
         
         return stats
     
     def calculate_quality_adjustment(self, target: EssentialMetrics, peer_stats: Dict) -> float:
         """Calculate quality adjustment factor based on ROE and D/E relative to peers"""
-        adjustments = []
+        nan = float('nan')
+        roe = roe_median = roe_std = de = de_median = de_std = nan  # NaN means "no data"
         
         # ROE adjustment (higher ROE = premium valuation)
         if (target.roe is not None and target.roe > -0.5 and target.roe < 1.0 and 
             'roe' in peer_stats and peer_stats['roe']['count'] >= 2):
-            
-            peer_roe_median = peer_stats['roe']['median']
-            peer_roe_std = peer_stats['roe']['std']
-            
-            if peer_roe_std > 0:
-                # Calculate z-score and convert to adjustment factor
-                roe_z_score = (target.roe - peer_roe_median) / peer_roe_std
-                # More conservative adjustment: cap between -15% and +15%
-                roe_adjustment = max(-0.15, min(0.15, roe_z_score * 0.05))
-                adjustments.append(roe_adjustment)
+            roe = target.roe
+            roe_median = peer_stats['roe']['median']
+            roe_std = peer_stats['roe']['std']
         
         # Debt-to-Equity adjustment (lower D/E = premium valuation)
         if (target.debt_to_equity is not None and target.debt_to_equity >= 0 and target.debt_to_equity <= 10.0 and
             'debt_to_equity' in peer_stats and peer_stats['debt_to_equity']['count'] >= 2):
-            
-            peer_de_median = peer_stats['debt_to_equity']['median']
-            peer_de_std = peer_stats['debt_to_equity']['std']
-            
-            if peer_de_std > 0:
-                # Calculate z-score (inverted because lower D/E is better)
-                de_z_score = (peer_de_median - target.debt_to_equity) / peer_de_std
-                # More conservative adjustment: cap between -10% and +10%
-                de_adjustment = max(-0.10, min(0.10, de_z_score * 0.04))
-                adjustments.append(de_adjustment)
-        
-        # Return combined adjustment factor with additional safety cap
-        if adjustments:
-            total_adjustment = sum(adjustments) / len(adjustments)  # Average the adjustments
-            # Final safety cap: maximum ±20% total adjustment
-            total_adjustment = max(-0.20, min(0.20, total_adjustment))
-            return 1.0 + total_adjustment  # Convert to multiplier (1.0 = no adjustment)
+            de = target.debt_to_equity
+            de_median = peer_stats['debt_to_equity']['median']
+            de_std = peer_stats['debt_to_equity']['std']
         
-        return 1.0  # No adjustment if no quality metrics available
+        return quality_multiplier(roe, roe_median, roe_std, de, de_median, de_std)
+    
     def _apply_sanity_checks(self, value_price: float, current_price: Optional[float], method: str) -> float:
         """Apply sanity checks to prevent extreme valuations"""
         if current_price and current_price > 0:
@@ -436,77 +911,34 @@ class ValuePriceCalculationService:
         # Calculate quality adjustment factor
         quality_adjustment = self.calculate_quality_adjustment(target, peer_stats)
         
-        # PE-based valuation
-        if (target.earnings_per_share and target.earnings_per_share > 0 and 
-            'pe_ratio' in peer_stats and peer_stats['pe_ratio']['count'] >= 2):
-            
-            peer_pe_median = peer_stats['pe_ratio']['median']
-            
-            # Additional check: ensure reasonable PE median
-            if 5 <= peer_pe_median <= 100:  # Reasonable PE range
-                base_pe_value_price = target.earnings_per_share * peer_pe_median
-                adjusted_pe_value_price = base_pe_value_price * quality_adjustment
-                
-                # Apply sanity checks
-                final_pe_value = self._apply_sanity_checks(adjusted_pe_value_price, target.current_price, "PE")
-                
-                components['pe_valuation'] = {
-                    'base_value_price': round(base_pe_value_price, 2),
-                    'quality_adjustment': round(quality_adjustment, 3),
-                    'value_price': round(final_pe_value, 2),
-                    'peer_median_multiple': round(peer_pe_median, 2),
-                    'target_metric_value': round(target.earnings_per_share, 2),
-                    'confidence': min(100, peer_stats['pe_ratio']['count'] * 20),
-                    'sanity_check_applied': final_pe_value != adjusted_pe_value_price
-                }
+        # Base value for every method at once: target per-share metric x peer median multiple (NaN when missing)
+        spec_stats = [peer_stats.get(spec[0]) for spec in self.VAL_SPECS]
+        metric_values = np.array([getattr(target, spec[1]) for spec in self.VAL_SPECS], dtype=np.float64)
+        peer_medians = np.array([stats['median'] if stats else np.nan for stats in spec_stats], dtype=np.float64)
+        peer_counts = np.array([stats['count'] if stats else 0 for stats in spec_stats])
+        base_values = metric_values * peer_medians
         
-        # PB-based valuation
-        if (target.book_value_per_share and target.book_value_per_share > 0 and 
-            'pb_ratio' in peer_stats and peer_stats['pb_ratio']['count'] >= 2):
-            
-            peer_pb_median = peer_stats['pb_ratio']['median']
-            
-            # Additional check: ensure reasonable PB median
-            if 0.1 <= peer_pb_median <= 20:  # Reasonable PB range
-                base_pb_value_price = target.book_value_per_share * peer_pb_median
-                adjusted_pb_value_price = base_pb_value_price * quality_adjustment
-                
-                # Apply sanity checks
-                final_pb_value = self._apply_sanity_checks(adjusted_pb_value_price, target.current_price, "PB")
-                
-                components['pb_valuation'] = {
-                    'base_value_price': round(base_pb_value_price, 2),
-                    'quality_adjustment': round(quality_adjustment, 3),
-                    'value_price': round(final_pb_value, 2),
-                    'peer_median_multiple': round(peer_pb_median, 2),
-                    'target_metric_value': round(target.book_value_per_share, 2),
-                    'confidence': min(100, peer_stats['pb_ratio']['count'] * 20),
-                    'sanity_check_applied': final_pb_value != adjusted_pb_value_price
-                }
+        # Positive target metric, enough peers, and a reasonable peer median multiple
+        available = ((metric_values > 0) & (peer_counts >= 2) &
+                     (peer_medians >= self._min_multiples) & (peer_medians <= self._max_multiples))
         
-        # PS-based valuation
-        if (target.revenue_per_share and target.revenue_per_share > 0 and 
-            'ps_ratio' in peer_stats and peer_stats['ps_ratio']['count'] >= 2):
+        for i in np.flatnonzero(available):
+            out_key, label = self.VAL_SPECS[i][4:]
+            base_value_price = float(base_values[i])
+            adjusted_value_price = base_value_price * quality_adjustment
             
-            peer_ps_median = peer_stats['ps_ratio']['median']
+            # Apply sanity checks
+            final_value = self._apply_sanity_checks(adjusted_value_price, target.current_price, label)
             
-            # Additional check: ensure reasonable PS median
-            if 0.1 <= peer_ps_median <= 30:  # Reasonable PS range
-                base_ps_value_price = target.revenue_per_share * peer_ps_median
-                adjusted_ps_value_price = base_ps_value_price * quality_adjustment
-                
-                # Apply sanity checks
-                final_ps_value = self._apply_sanity_checks(adjusted_ps_value_price, target.current_price, "PS")
-                
-                components['ps_valuation'] = {
-                    'base_value_price': round(base_ps_value_price, 2),
-                    'quality_adjustment': round(quality_adjustment, 3),
-                    'value_price': round(final_ps_value, 2),
-                    'peer_median_multiple': round(peer_ps_median, 2),
-                    'target_metric_value': round(target.revenue_per_share, 2),
-                    'confidence': min(100, peer_stats['ps_ratio']['count'] * 20),
-                    'sanity_check_applied': final_ps_value != adjusted_ps_value_price
-                }
+            components[out_key] = {
+                'base_value_price': round(base_value_price, 2),
+                'quality_adjustment': round(quality_adjustment, 3),
+                'value_price': round(final_value, 2),
+                'peer_median_multiple': round(float(peer_medians[i]), 2),
+                'target_metric_value': round(float(metric_values[i]), 2),
+                'confidence': min(100, int(peer_counts[i]) * 20),
+                'sanity_check_applied': final_value != adjusted_value_price
+            }
         
         return components
     
@@ -522,22 +954,17 @@ class ValuePriceCalculationService:
             return value_price, method_name.upper()
         
         # Calculate weighted average based on confidence
-        total_weight = 0
-        weighted_sum = 0
-        
-        for method, data in components.items():
-            weight = data['confidence'] / 100  # Normalize confidence to 0-1
-            weighted_sum += data['value_price'] * weight
-            total_weight += weight
+        prices = np.array([data['value_price'] for data in components.values()], dtype=np.float64)
+        weights = np.array([data['confidence'] for data in components.values()], dtype=np.float64) / 100  # Normalize confidence to 0-1
+        total_weight = weights.sum()
         
         if total_weight > 0:
-            composite_price = weighted_sum / total_weight
-            return round(composite_price, 2), ValuationMethod.COMPOSITE.value
+            # Elementwise product then sum rather than np.dot: BLAS reorders the accumulation, which moves cent-rounding ties
+            composite_price = (prices * weights).sum() / total_weight
+            return round(float(composite_price), 2), ValuationMethod.COMPOSITE.value
         
         # Fallback to simple average
-        prices = [data['value_price'] for data in components.values()]
-        average_price = sum(prices) / len(prices)
-        return round(average_price, 2), ValuationMethod.COMPOSITE.value
+        return round(float(prices.mean()), 2), ValuationMethod.COMPOSITE.value
     
     def generate_insights(self, target: EssentialMetrics, components: Dict, 
                          current_price: Optional[float], value_price: Optional[float],
@@ -619,7 +1046,7 @@ class StockValuationService:
     def dcf_data(self, ticker: str):
     #This try and except block will handle errors in case the ticker is not found or the data cannot be retrieved.   
         try:
-            stock = yf.Ticker(ticker)
+            stock = get_ticker(ticker)
             cashflow = stock.cashflow
             balance_sheet = stock.balance_sheet
             # Extract the most recent data points
@@ -642,39 +1069,105 @@ class StockValuationService:
     
     """Main service for calculating stock value price using peer multiples"""
     
+    # Share of the gap between market price and peer-implied value that the reported value price moves
+    VALUE_PRICE_DAMPING = 0.2
+    
     def __init__(self, project_id: Optional[str] = None, location: str = 'us-central1', cache_duration: int = 30):
         # Initialize AI client if provided
         ai_client = None
         if project_id:
             try:
-                ai_client = genai.Client(vertexai=True, project=project_id, location=location)
+                ai_client = get_client(project_id, location)  # Shared per process
             except Exception as e:
                 logger.warning(f"AI client initialization failed: {e}")
         
-        self.peer_service = PeerCompanyService(ai_client)
-        self.stock_service = OptimizedStockDataService(cache_duration)
+        self.peer_service = PeerCompanyService(ai_client, disk_cache=DiskCache(table="peers"))
+        self.stock_service = OptimizedStockDataService(cache_duration, disk_cache=DiskCache(table="metrics"))
         self.valuation_service = ValuePriceCalculationService()
+        # Overlaps the independent lookups at the start of each valuation
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=16)
+        # Finished results, shared across restarts and worker processes
+        self._valuation_cache = DiskCache(table="valuations")
+        self._valuation_ttl = timedelta(minutes=cache_duration)
+        self._inflight_valuations: Dict[Tuple[str, int], asyncio.Task] = {}  # Coalesces concurrent async requests
     
     def get_stock_valuation(self, ticker: str, num_peers: int = 6) -> ValuationResult:
         """Main valuation method - returns calculated value price"""
-        # Validate ticker quickly
-        if not self.stock_service.validate_ticker_fast(ticker):
-            raise ValueError(f"Invalid ticker: {ticker}")
+        cached_result = self._get_cached_valuation(ticker, num_peers)
+        if cached_result is not None:
+            return cached_result
         
-        # Get peer tickers with requested count
-        peer_tickers = self.peer_service.get_peers(ticker, num_peers)
-        logger.info(f"Requested {num_peers} peers, got {len(peer_tickers)}: {peer_tickers}")
+        cached_inputs = self._get_cached_inputs(ticker, num_peers)
+        if cached_inputs is not None:
+            # Fast path: target and every peer are cached, so there's nothing to validate or fetch
+            target_metrics, peer_tickers, all_peer_metrics = cached_inputs
+            dcf_price = calculate_dcf_with_llm_rates(ticker, 0.025, 0.1, 5)
+        else:
+            # Validation, peer lookup, the target's metrics and the DCF don't depend on each other, so run them together
+            validation = self._prefetch_executor.submit(self.stock_service.validate_ticker_fast, ticker)
+            peers_future = self._prefetch_executor.submit(self.peer_service.get_peers, ticker, num_peers)
+            target_future = self._prefetch_executor.submit(self.stock_service.get_essential_metrics, ticker)
+            dcf_future = self._prefetch_executor.submit(calculate_dcf_with_llm_rates, ticker, 0.025, 0.1, 5)
+            
+            if not validation.result():
+                raise ValueError(f"Invalid ticker: {ticker}")
+            
+            # Get peer tickers with requested count
+            peer_tickers = peers_future.result()
+            
+            # Batch fetch the peers while the target's fetch finishes
+            target_metrics = target_future.result()
+            all_peer_metrics = self.stock_service.get_batch_metrics(peer_tickers)
+            dcf_price = dcf_future.result()
         
-        # Batch fetch all data at once (target + peers)
-        all_tickers = [ticker] + peer_tickers
-        all_metrics = self.stock_service.get_batch_metrics(all_tickers)
+        return self._build_valuation(ticker, num_peers, target_metrics, peer_tickers, all_peer_metrics, dcf_price)
+    
+    async def get_stock_valuation_async(self, ticker: str, num_peers: int = 6) -> ValuationResult:
+        """Async variant of get_stock_valuation; concurrent requests for the same valuation share one computation"""
+        key = (ticker.upper(), num_peers)
+        task = self._inflight_valuations.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute_stock_valuation_async(ticker, num_peers))
+            self._inflight_valuations[key] = task
+            task.add_done_callback(lambda done: self._inflight_valuations.pop(key, None))
+        # Shield so one disconnected client does not cancel the work others are waiting on
+        return await asyncio.shield(task)
+    
+    async def _compute_stock_valuation_async(self, ticker: str, num_peers: int) -> ValuationResult:
+        """Blocking lookups, including SQLite cache reads and writes, run in threads so the event loop stays free"""
+        cached_result = await asyncio.to_thread(self._get_cached_valuation, ticker, num_peers)
+        if cached_result is not None:
+            return cached_result
         
-        if not all_metrics:
-            raise ValueError(f"Could not fetch data for {ticker}")
+        cached_inputs = await asyncio.to_thread(self._get_cached_inputs, ticker, num_peers)
+        if cached_inputs is not None:
+            target_metrics, peer_tickers, all_peer_metrics = cached_inputs
+            dcf_price = await asyncio.to_thread(calculate_dcf_with_llm_rates, ticker, 0.025, 0.1, 5)
+        else:
+            validation = asyncio.create_task(asyncio.to_thread(self.stock_service.validate_ticker_fast, ticker))
+            peers_task = asyncio.create_task(self.peer_service.get_peers_async(ticker, num_peers))
+            target_task = asyncio.create_task(self.stock_service.aget_essential_metrics(ticker))
+            dcf_task = asyncio.create_task(asyncio.to_thread(calculate_dcf_with_llm_rates, ticker, 0.025, 0.1, 5))
+            
+            if not await validation:
+                for task in (peers_task, target_task, dcf_task):
+                    task.cancel()
+                raise ValueError(f"Invalid ticker: {ticker}")
+            
+            peer_tickers = await peers_task
+            all_peer_metrics = await self.stock_service.aget_batch_metrics(peer_tickers)
+            target_metrics = await target_task
+            dcf_price = await dcf_task
         
-        # Separate target from peers
-        target_metrics = all_metrics[0]
-        peer_metrics = [m for m in all_metrics[1:] if m.market_cap is not None]
+        return await asyncio.to_thread(
+            self._build_valuation, ticker, num_peers, target_metrics, peer_tickers, all_peer_metrics, dcf_price
+        )
+    
+    def _build_valuation(self, ticker: str, num_peers: int, target_metrics: EssentialMetrics, peer_tickers: List[str],
+                         all_peer_metrics: List[EssentialMetrics], dcf_price: float) -> ValuationResult:
+        """Turn fetched target and peer data into a ValuationResult"""
+        logger.info(f"Requested {num_peers} peers, got {len(peer_tickers)}: {peer_tickers}")
+        peer_metrics = [m for m in all_peer_metrics if m.market_cap is not None]
         successful_peers = [m.ticker for m in peer_metrics]
         
         logger.info(f"Successfully analyzed {len(peer_metrics)} out of {len(peer_tickers)} requested peers")
@@ -691,22 +1184,19 @@ class StockValuationService:
         price_difference_percent = None
         
         if current_price and calculated_value_price:
-            price_difference = round(calculated_value_price - current_price, 2)
-            price_difference = price_difference * 0.2
+            # Move only part of the way from the market price toward the peer-implied value, rounded to cents
+            price_difference = round((calculated_value_price - current_price) * self.VALUE_PRICE_DAMPING, 2)
             price_difference_percent = round((price_difference / current_price) * 100, 2)
-
-            calculated_value_price = current_price + price_difference
-
-        
+            calculated_value_price = round(current_price + price_difference, 2)
         
         # Generate insights
         insights = self.valuation_service.generate_insights(
             target_metrics, valuation_components, current_price, calculated_value_price, peer_stats
         )
         
-        return ValuationResult(
+        result = ValuationResult(
             ticker=ticker.upper(),
-            full_name=yf.Ticker(ticker).info["longName"],
+            full_name=target_metrics.full_name or ticker.upper(),
             analysis_date=datetime.now().isoformat(),
             current_price=current_price,
             calculated_value_price=calculated_value_price,
@@ -719,8 +1209,88 @@ class StockValuationService:
             peer_statistics=peer_stats,
             valuation_components=valuation_components,
             key_insights=insights,
-            dcf_price=calculate_dcf_with_llm_rates(ticker, 0.025, 0.1, 5)
+            dcf_price=dcf_price
         )
+        # Like failed metric fetches, degraded results are served but not cached, so the next request retries
+        dcf_failed = isinstance(dcf_price, dict) and "error" in dcf_price
+        no_value = calculated_value_price is None or method == ValuationMethod.INSUFFICIENT_DATA.value
+        if target_metrics.market_cap is not None and current_price is not None and not dcf_failed and not no_value:
+            self._valuation_cache.set(
+                self._valuation_key(ticker, num_peers), result.to_dict(), self._valuation_ttl.total_seconds()
+            )
+        return result
+    
+    def _valuation_key(self, ticker: str, num_peers: int) -> str:
+        """Valuations are reused for the rest of the day at most"""
+        return make_key("valuation", ticker.upper(), num_peers, date.today().isoformat())
+    
+    def _get_cached_valuation(self, ticker: str, num_peers: int) -> Optional[ValuationResult]:
+        """Previously computed result for this ticker and peer count, if still fresh"""
+        entry = self._valuation_cache.get(self._valuation_key(ticker, num_peers))
+        if entry is None:
+            return None
+        try:
+            return ValuationResult(**entry)
+        except TypeError:
+            return None  # Written by an older ValuationResult layout
+    
+    def _get_cached_inputs(self, ticker: str, num_peers: int) -> Optional[Tuple[EssentialMetrics, List[str], List[EssentialMetrics]]]:
+        """Target metrics, peer tickers and peer metrics if all of them are cached, else None"""
+        target_metrics = self.stock_service.cache.get(ticker)
+        if target_metrics is None or target_metrics.market_cap is None:
+            return None  # Not cached, or would fail validation
+        
+        peer_tickers = self.peer_service.get_cached_peers(ticker, num_peers)
+        if peer_tickers is None:
+            return None
+        
+        peer_metrics = []
+        for peer in peer_tickers:
+            metrics = self.stock_service.cache.get(peer)
+            if metrics is None:
+                if not self.stock_service.is_unknown_symbol(peer):
+                    return None
+                # Screened out by a recent batch quote; there is no data to wait for
+                metrics = EssentialMetrics(ticker=peer.upper())
+            peer_metrics.append(metrics)
+        return target_metrics, peer_tickers, peer_metrics
+    
+    def get_stock_valuation_bulk(self, tickers: List[str], num_peers: int = 6) -> Dict[str, ValuationResult]:
+        """Value several stocks; peers for all of them come from one AI call and metrics are prefetched together"""
+        candidates = [t for t in dict.fromkeys(tickers) if is_valid_ticker_format(t)]
+        
+        # One batch quote screens out unknown symbols instead of a fast_info call per ticker
+        known_symbols = self.stock_service._fetch_known_symbols(candidates)
+        if known_symbols is not None:
+            candidates = [t for t in candidates if t.upper() in known_symbols]
+        
+        if not candidates:
+            logger.warning(f"No valid tickers in bulk valuation: {tickers}")
+            return {}
+        
+        # Separate pool: get_stock_valuation submits its own prefetches to _prefetch_executor
+        with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as executor:
+            validity = list(executor.map(self.stock_service.validate_ticker_fast, candidates))
+            valid_tickers = [t for t, ok in zip(candidates, validity) if ok]
+            for ticker in set(tickers) - set(valid_tickers):
+                logger.warning(f"Skipping invalid ticker in bulk valuation: {ticker}")
+            
+            if not valid_tickers:
+                return {}
+            
+            self.warm_cache(valid_tickers, num_peers)
+            
+            # Each valuation now resolves peers and metrics from cache; the DCF lookups overlap
+            futures = {ticker: executor.submit(self.get_stock_valuation, ticker, num_peers) for ticker in valid_tickers}
+        return {ticker: future.result() for ticker, future in futures.items()}
+    
+    def warm_cache(self, tickers: List[str], num_peers: int = 6):
+        """Load peers and metrics for these tickers ahead of time so later valuations are served from cache"""
+        peers_by_ticker = self.peer_service.get_peers_bulk(tickers, num_peers)
+        
+        # Warm the metrics cache for every target and peer in one batch
+        all_tickers = list(tickers) + [p for peers in peers_by_ticker.values() for p in peers]
+        self.stock_service.get_batch_metrics(list(dict.fromkeys(all_tickers)))
     
     def get_basic_metrics(self, ticker: str) -> Dict[str, Any]:
         """Get basic metrics with caching"""
@@ -737,6 +1307,25 @@ class StockValuationService:
     def clear_cache(self):
         """Clear all cached data"""
         self.stock_service.cache.clear()
+        self.stock_service.clear_validation_cache()
+        self._valuation_cache.clear()
+    
+    def warm_up(self):
+        """Pay one-time setup costs at startup instead of on the first request"""
+        # Shared Gemini client used by the DCF growth-rate lookup; loads credentials once
+        get_client()
+        
+        # Run the peer statistics and value math once on synthetic data
+        target = EssentialMetrics(ticker="WARMUP", current_price=100.0, earnings_per_share=5.0,
+                                  book_value_per_share=20.0, revenue_per_share=30.0, roe=0.15, debt_to_equity=1.0)
+        peers = [
+            EssentialMetrics(ticker=f"PEER{i}", market_cap=1e9, pe_ratio=15.0 + i, pb_ratio=2.0 + i / 10,
+                             ps_ratio=3.0 + i / 10, roe=0.1 + i / 100, debt_to_equity=0.5 + i / 10)
+            for i in range(5)
+        ]
+        peer_stats = self.valuation_service.calculate_peer_statistics(peers)
+        components = self.valuation_service.calculate_value_price_components(target, peer_stats)
+        self.valuation_service.calculate_composite_value_price(components)
 
 # Example usage optimized for production
 if __name__ == "__main__":
@@ -770,15 +1359,44 @@ class BasicInfoService:
     def __init__(self):
         pass
 
+    @staticmethod
     def get_info(stock):
-        info = {}
+        tick = get_ticker(stock)
+        return BasicInfoService._basic_fields(stock, fetch_info(tick))
 
-        tick = yf.Ticker(stock)
-        tick_info = tick.info
+    @staticmethod
+    def _basic_fields(stock: str, tick_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Pick the basic fields out of a yfinance info blob"""
+        return {
+            "ticker": stock.upper(),
+            "full_name": tick_info.get("longName"),
+            "price": tick_info.get("currentPrice") or tick_info.get("regularMarketPrice"),
+        }
+
+    @staticmethod
+    def get_info_many(stocks: List[str], max_workers: int = 16) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get basic info for several tickers concurrently"""
+        results = dict(BasicInfoService.iter_info(stocks, max_workers))
+        return {stock: results[stock] for stock in stocks}
 
-        info["full_name"] = tick_info["longName"]
-        info["price"] = tick_info["currentPrice"]
-        info[stock] = stock
+    @staticmethod
+    def iter_info(stocks: List[str], max_workers: int = 16) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Yield (ticker, info) pairs as each concurrent lookup completes"""
+        if not stocks:
+            return
 
+        # One Tickers container for the whole list instead of a Ticker per lookup
+        tickers = get_tickers(stocks)
+
+        def fetch_one(stock):
+            try:
+                return stock, BasicInfoService._basic_fields(stock, fetch_info(tickers.tickers[stock.upper()]))
+            except Exception as e:
+                logger.error(f"Error fetching basic info for {stock}: {e}")
+                return stock, None
 
-        return info
\ No newline at end of file
+        # Yahoo lookups are pure I/O wait, so threads overlap them well; cap workers to avoid rate limits
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(stocks))) as executor:
+            futures = [executor.submit(fetch_one, stock) for stock in dict.fromkeys(stocks)]
+            for future in as_completed(futures):
+                yield future.result()
@@ -1,77 +1,89 @@
-import yfinance as yf
-from google import genai
-import json 
+from datetime import date
+from functools import lru_cache
+
+from genai_client import get_client
+from yahoo_client import get_ticker
 
 def get_projected_growth_rates(ticker: str, projection_years: int = 5) -> list[float]:
     """
    Uses Gemini to get estimates of growth rates (because the growth rate cannot be a constant value in the calculations.)
     """
     try:
-        client = genai.Client(
-            vertexai=True, project='kir-sprinternship-2025-dev', location='us-central1'
-        )
-
-        # Prompt Gemini to estimate realistic growth rates. 
-        prompt = (
-            f"Act as an experienced financial analyst. Given the ticker {ticker}, "
-            f"estimate a reasonable annual Free Cash Flow (FCF) growth rate for each of the "
-            f"next {projection_years} years. "
-            f"Provide the output as a JSON array of floating-point numbers. "
-            f"Ensure the growth rates are presented as decimals (e.g., 0.10 for 10%)."
-        )
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config={
-                "temperature": 0.05, # Use a low temperature for more conservative, factual-based estimates
-                "response_mime_type": "application/json",
-                "response_schema": { 
-                    "type": "array",
-                    "items": { "type": "number" }
-                },
-            },
-        )
-        
-        # The response is parsed automatically if the schema is followed.
-        growth_rates: list[float] = response.parsed
-
-        # It's a good idea to perform a quick sanity check on the output
-        if len(growth_rates) == projection_years:
-            return growth_rates
-        else:
-            print(f"Warning: AI returned {len(growth_rates)} growth rates, expected {projection_years}.")
-            return []
-
+        # Copy so callers can't modify the cached list
+        return list(_growth_rates_for_day(ticker.upper(), projection_years, date.today().isoformat()))
     except Exception as e:
         print(f"Error retrieving growth rates for {ticker}: {e}")
         return []
 
+# Memoized per day; errors raise instead of returning, so failures are never cached
+@lru_cache(maxsize=1024)
+def _growth_rates_for_day(ticker: str, projection_years: int, day: str) -> tuple[float, ...]:
+    client = get_client()
+
+    # Prompt Gemini to estimate realistic growth rates. 
+    prompt = (
+        f"Act as an experienced financial analyst. Given the ticker {ticker}, "
+        f"estimate a reasonable annual Free Cash Flow (FCF) growth rate for each of the "
+        f"next {projection_years} years. "
+        f"Provide the output as a JSON array of floating-point numbers. "
+        f"Ensure the growth rates are presented as decimals (e.g., 0.10 for 10%)."
+    )
+
+    response = client.models.generate_content(
+        model="gemini-2.5-flash",
+        contents=prompt,
+        config={
+            "temperature": 0.05, # Use a low temperature for more conservative, factual-based estimates
+            "response_mime_type": "application/json",
+            "response_schema": { 
+                "type": "array",
+                "items": { "type": "number" }
+            },
+        },
+    )
+    
+    # The response is parsed automatically if the schema is followed.
+    growth_rates: list[float] = response.parsed
+
+    # It's a good idea to perform a quick sanity check on the output
+    if len(growth_rates) != projection_years:
+        raise ValueError(f"AI returned {len(growth_rates)} growth rates, expected {projection_years}.")
+    return tuple(growth_rates)
+
 #This function will retrieve the data needed for the DCF calculation, from the yfinance API.
 def dcf_data(ticker: str):
 #This try and except block will handle errors in case the ticker is not found or the data cannot be retrieved.   
     try:
-        stock = yf.Ticker(ticker)
-        cashflow = stock.cashflow
-        balance_sheet = stock.balance_sheet
-        # Extract the most recent data points
-        fcf = cashflow.loc['Free Cash Flow'][0] if not cashflow.empty and 'Free Cash Flow' in cashflow.index else None
-        cash_and_equivalents = balance_sheet.loc['Cash And Cash Equivalents'][0] if not balance_sheet.empty and 'Cash And Cash Equivalents' in balance_sheet.index else None
-        total_debt = balance_sheet.loc['Total Debt'][0] if not balance_sheet.empty and 'Total Debt' in balance_sheet.index else None
-        shares_outstanding = stock.info.get('sharesOutstanding')
-
-        return {
-            "ticker": ticker,
-            "FCF": fcf,
-            "Cash & Cash Equivalents": cash_and_equivalents,
-            "Total Debt": total_debt,
-            "Shares Outstanding": shares_outstanding
-        }
+        # Copy so callers can't modify the cached data
+        return dict(_dcf_data_for_day(ticker, date.today().isoformat()))
         #if ticker is not found: 
     except Exception as e:
         print(f"Error retrieving data for {ticker}: {e}")
         return None
 
+# Financial statements change at most daily, so fetch them once per ticker per day.
+# Errors and incomplete data raise, so they are not cached; yfinance returns empty statements when rate limited
+@lru_cache(maxsize=1024)
+def _dcf_data_for_day(ticker: str, day: str) -> dict:
+    stock = get_ticker(ticker)
+    cashflow = stock.cashflow
+    balance_sheet = stock.balance_sheet
+    # Extract the most recent data points
+    fcf = cashflow.loc['Free Cash Flow'][0] if not cashflow.empty and 'Free Cash Flow' in cashflow.index else None
+    cash_and_equivalents = balance_sheet.loc['Cash And Cash Equivalents'][0] if not balance_sheet.empty and 'Cash And Cash Equivalents' in balance_sheet.index else None
+    total_debt = balance_sheet.loc['Total Debt'][0] if not balance_sheet.empty and 'Total Debt' in balance_sheet.index else None
+    shares_outstanding = stock.info.get('sharesOutstanding')
+    if fcf is None or shares_outstanding is None:
+        raise ValueError(f"Incomplete DCF data for {ticker}: FCF={fcf}, shares outstanding={shares_outstanding}")
+
+    return {
+        "ticker": ticker,
+        "FCF": fcf,
+        "Cash & Cash Equivalents": cash_and_equivalents,
+        "Total Debt": total_debt,
+        "Shares Outstanding": shares_outstanding
+    }
+
 
 def calculate_dcf_with_llm_rates(
     ticker: str,
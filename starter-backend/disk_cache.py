@@ -0,0 +1,76 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "INVESTER_CACHE_PATH", os.path.join(tempfile.gettempdir(), "invester_cache.sqlite3")
+)
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key by hashing the given parts"""
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+
+class DiskCache:
+    """SQLite-backed cache that survives restarts and is shared between worker processes"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, table: str = "cache"):
+        self.path = path
+        self.table = table  # Separate tables let each cache be cleared on its own
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        with self._lock, self._conn:
+            # WAL lets worker processes read while another one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_expires_at ON {table} (expires_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value if present and not expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?", (key, time.time())
+                ).fetchone()
+            return orjson.loads(zlib.decompress(row[0])) if row else None
+        except (sqlite3.Error, zlib.error, orjson.JSONDecodeError) as e:
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: Any, expire_seconds: float):
+        """Store a JSON-serializable value, compressed, for expire_seconds"""
+        try:
+            blob = zlib.compress(orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY))
+            with self._lock, self._conn:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, blob, time.time() + expire_seconds),
+                )
+        except (sqlite3.Error, TypeError) as e:
+            logger.warning(f"Disk cache write failed: {e}")
+
+    def evict_expired(self):
+        """Delete entries whose expiry has passed"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache eviction failed: {e}")
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
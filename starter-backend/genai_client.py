@@ -0,0 +1,63 @@
+import importlib.util
+import threading
+from typing import Any, Dict, Tuple
+
+import httpx
+import orjson
+from google import genai
+from google.genai import errors, types
+
+from disk_cache import make_key
+
+DEFAULT_PROJECT_ID = 'kir-sprinternship-2025-dev'
+DEFAULT_LOCATION = 'us-central1'
+# Fail fast instead of tying up a worker on a hung request
+REQUEST_TIMEOUT_MS = 20_000
+# How long a stored response for an identical request stays valid
+AI_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Worth retrying: 5xx, rate limiting (429) and network failures; other 4xx are permanent
+TRANSIENT_ERRORS = (errors.ServerError, errors.ClientError, httpx.TimeoutException, httpx.TransportError)
+
+# HTTP/2 multiplexes concurrent Gemini calls over one connection; needs the h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# One client per (project, location) so HTTP connections and credentials are reused
+_clients: Dict[Tuple[str, str], genai.Client] = {}
+_clients_lock = threading.Lock()
+
+def get_client(project_id: str = DEFAULT_PROJECT_ID, location: str = DEFAULT_LOCATION) -> genai.Client:
+    """Get the shared Vertex AI client, creating it on first use"""
+    key = (project_id, location)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = genai.Client(
+                    vertexai=True,
+                    project=project_id,
+                    location=location,
+                    http_options=types.HttpOptions(
+                        timeout=REQUEST_TIMEOUT_MS,
+                        client_args=_http_client_args(),
+                        async_client_args=_http_client_args(),
+                    ),
+                )
+                _clients[key] = client
+    return client
+
+def _http_client_args() -> Dict[str, Any]:
+    """httpx client settings shared by the sync and async Gemini transports"""
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "limits": httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    }
+
+def request_cache_key(request: Dict[str, Any]) -> str:
+    """Content hash of a generate_content request, so any prompt or config change gets a new key"""
+    return make_key(orjson.dumps(request, default=str, option=orjson.OPT_SORT_KEYS).decode())
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed Gemini call is worth retrying"""
+    return not isinstance(error, errors.ClientError) or error.code == 429
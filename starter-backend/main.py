@@ -1,6 +1,13 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from core_services import StockValuationService, BasicInfoService
 from pydantic import BaseModel
 from sentiment import StockSentimentService
@@ -14,16 +21,46 @@ class DcfCalculationRequest(BaseModel):
 
 
 
-# Create a FastAPI instance
-app = FastAPI()
-valuation_service = StockValuationService(
+logger = logging.getLogger(__name__)
+
+# Threads behind asyncio.to_thread; the default pool of min(32, cpus + 4) is too small on small hosts
+BLOCKING_IO_WORKERS = 32
+
+# Peer lists live for a day; checking hourly refreshes them well before they expire
+PEER_REFRESH_INTERVAL_SECONDS = 60 * 60
+
+async def refresh_peers_periodically(valuation_service: StockValuationService):
+    while True:
+        await asyncio.sleep(PEER_REFRESH_INTERVAL_SECONDS)
+        try:
+            refreshed = await asyncio.to_thread(valuation_service.peer_service.refresh_expiring_peers)
+            logger.info(f"Refreshed {refreshed} expiring peer lists")
+        except Exception as e:
+            logger.warning(f"Peer refresh failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+    )
+    # Build the services once per worker process, on startup rather than at import
+    app.state.valuation = StockValuationService(
         project_id='kir-sprinternship-2025-dev',
         cache_duration=60  # 1 hour cache
     )
-
-sentiment_service = StockSentimentService(
+    app.state.sentiment = StockSentimentService(
         project_id='kir-sprinternship-2025-dev'
     )
+    try:
+        await asyncio.to_thread(app.state.valuation.warm_up)
+    except Exception as e:
+        logger.warning(f"Warm-up failed, first request will pay setup costs: {e}")
+    refresh_task = asyncio.create_task(refresh_peers_periodically(app.state.valuation))
+    yield
+    refresh_task.cancel()
+
+# Create a FastAPI instance
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Mount the static files directory
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -33,21 +70,41 @@ async def root():
     return {"message": "Hello World"}
 
 @app.get("/value/{stock}")
-async def value(stock: str):
-    return {"result": valuation_service.get_stock_valuation(stock, 15)}
+async def value(stock: str, request: Request):
+    # orjson serializes the ValuationResult dataclass itself, skipping FastAPI's jsonable_encoder pass
+    return ORJSONResponse({"result": await request.app.state.valuation.get_stock_valuation_async(stock, 15)})
 
 @app.get("/sentiment/{stock}")
-async def sentiment(stock: str):
-    return {"result": sentiment_service.get_sentiment(stock)}
+async def sentiment(stock: str, request: Request):
+    return {"result": await request.app.state.sentiment.get_sentiment(stock)}
 
 @app.get("/basic/{stock}")
 async def basic(stock: str):
     return {"basic_info": BasicInfoService.get_info(stock)}
 
+def _parse_tickers(tickers: str):
+    return [t.strip() for t in tickers.split(",") if t.strip()]
+
+@app.get("/basic")
+def basic_many(tickers: str):
+    # Plain def: the threaded Yahoo fan-out blocks, so FastAPI runs this in its threadpool
+    return ORJSONResponse({"basic_info": BasicInfoService.get_info_many(_parse_tickers(tickers))})
+
+@app.get("/basic-stream")
+def basic_stream(tickers: str):
+    # One JSON line per ticker, written as soon as its lookup finishes
+    lines = (
+        orjson.dumps({"ticker": stock, "basic_info": info}, option=orjson.OPT_APPEND_NEWLINE)
+        for stock, info in BasicInfoService.iter_info(_parse_tickers(tickers))
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
 @app.post("/api/dcf-calculate")
 async def dcf_calculate_endpoint(request: DcfCalculationRequest):
     try: 
-        dcf_result = calculate_dcf_with_llm_rates(
+        # Yahoo and Gemini calls block, so run the calculation off the event loop
+        dcf_result = await asyncio.to_thread(
+            calculate_dcf_with_llm_rates,
             ticker=request.ticker,
             perpetual_growth_rate=request.perpetual_growth_rate,
             discount_rate=request.discount_rate,
@@ -57,7 +114,8 @@ async def dcf_calculate_endpoint(request: DcfCalculationRequest):
         return dcf_result
 
     except Exception as e:
-        print("Error")
+        logger.exception(f"DCF calculation failed for {request.ticker}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 
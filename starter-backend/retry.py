@@ -0,0 +1,70 @@
+import asyncio
+import functools
+import logging
+import random
+import time
+from typing import Callable, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-requested wait from a Retry-After header on the error's HTTP response, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None  # Missing, or an HTTP date we don't bother parsing
+
+def _backoff_delay(error: BaseException, attempt: int, base_delay: float, max_delay: float) -> Optional[float]:
+    """Exponential backoff plus jitter, stretched to any server-requested Retry-After.
+    None if the server asks us to wait longer than max_delay; callers give up rather than park a thread."""
+    retry_after = retry_after_seconds(error) or 0
+    if retry_after > max_delay:
+        return None
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1)) + random.uniform(0, base_delay)
+    return max(delay, retry_after)
+
+def retry_transient(exceptions: Tuple[Type[BaseException], ...], attempts: int = 3,
+                    base_delay: float = 0.2, max_delay: float = 2.0,
+                    retry_if: Optional[Callable[[BaseException], bool]] = None) -> Callable:
+    """Retry a call on transient errors with exponential backoff plus jitter, honouring Retry-After"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == attempts or (retry_if and not retry_if(e)):
+                        raise
+                    delay = _backoff_delay(e, attempt, base_delay, max_delay)
+                    if delay is None:
+                        raise
+                    logger.warning(f"{func.__name__} failed ({e}), retry {attempt}/{attempts - 1} in {delay:.2f}s")
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+def async_retry_transient(exceptions: Tuple[Type[BaseException], ...], attempts: int = 3,
+                          base_delay: float = 0.2, max_delay: float = 2.0,
+                          retry_if: Optional[Callable[[BaseException], bool]] = None) -> Callable:
+    """retry_transient for coroutines; waits with asyncio.sleep so the event loop keeps running"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == attempts or (retry_if and not retry_if(e)):
+                        raise
+                    delay = _backoff_delay(e, attempt, base_delay, max_delay)
+                    if delay is None:
+                        raise
+                    logger.warning(f"{func.__name__} failed ({e}), retry {attempt}/{attempts - 1} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+        return wrapper
+    return decorator
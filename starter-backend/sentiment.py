@@ -1,6 +1,10 @@
-from typing import Optional
-from google import genai
-from yfinance import Ticker
+import asyncio
+from typing import Dict, Optional
+
+import orjson
+from genai_client import TRANSIENT_ERRORS, get_client, is_transient_error
+from retry import async_retry_transient
+from yahoo_client import get_ticker
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -12,29 +16,41 @@ class StockSentimentService:
         self.ai_client = None
         if project_id:
             try:
-                self.ai_client = genai.Client(vertexai=True, project=project_id, location=location)
+                self.ai_client = get_client(project_id, location)  # Shared per process
             except Exception as e:
                 logger.warning(f"AI client initialization failed: {e}")
+        self._inflight: Dict[str, asyncio.Task] = {}  # Coalesces concurrent requests per ticker
 
-    def get_sentiment(self, stock: str) -> str:
-        tick = Ticker(stock)
-        news = tick.get_news(10)
-        features = []
-
-        for new in news:
-            news_info = {}
-            news_info["contentType"] = new["content"]["contentType"]
-            news_info["title"] = new["content"]["title"]
-            news_info["summary"] = new["content"]["summary"]
-            news_info["description"] = new["content"]["description"]
-            news_info["pubDate"] = new["content"]["pubDate"]
-            news_info["publisher"] = new["content"]["provider"]['displayName']
-            features.append(news_info)
-        
+    async def get_sentiment(self, stock: str) -> str:
+        # Concurrent requests for the same ticker share one news fetch and Gemini call
+        key = stock.upper()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._analyze_sentiment(stock))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
 
-        prompt = f"You are a market trends analyst. You have already read the following news articles / video {features}. Write a 120-word report on your professional opinion of {stock} in the coming months. Cite the articles whenever you reference information from them. \n \n "
+    async def _analyze_sentiment(self, stock: str) -> str:
+        tick = get_ticker(stock)
+        # yfinance is blocking, so fetch the news in a thread to keep the event loop free
+        news = await asyncio.to_thread(tick.get_news, 10)
+        # Only the fields that carry sentiment; missing keys become null instead of raising
+        features = [
+            {
+                "title": content.get("title"),
+                "summary": content.get("summary"),
+                "description": content.get("description"),
+                "publisher": (content.get("provider") or {}).get("displayName"),
+            }
+            for content in (article.get("content") or {} for article in news)
+        ]
+        # Compact JSON uses far fewer prompt tokens than the Python repr of the list
+        articles = orjson.dumps(features).decode()
 
-        response = self.ai_client.models.generate_content(
+        prompt = f"You are a market trends analyst. You have already read the following news articles / video {articles}. Write a 120-word report on your professional opinion of {stock} in the coming months. Cite the articles whenever you reference information from them. \n \n "
+
+        response = await self._generate_content(
             model="gemini-2.5-flash",
             contents=prompt,
             config={
@@ -46,3 +62,8 @@ class StockSentimentService:
         
         sentiment_analysis = response.parsed
         return sentiment_analysis
+
+    @async_retry_transient(TRANSIENT_ERRORS, retry_if=is_transient_error)
+    async def _generate_content(self, **request):
+        # Rate limits, server errors and network failures are retried with backoff
+        return await self.ai_client.aio.models.generate_content(**request)
@@ -8,8 +8,8 @@ projection_years = 5
 target_ticker = "GOOG" 
 perpetual_growth_rate = 0.025 
 discount_rate = 0.1
-print(calculate_dcf_with_llm_rates("GOOG"))  
 
+# Inputs first, so the DCF below reuses the memoized financial data and growth rates
 financial_data_test = dcf_data("GOOG")
 if financial_data_test:
     print(json.dumps(financial_data_test, indent=4))
@@ -0,0 +1,51 @@
+import yfinance as yf
+from curl_cffi import requests as curl_requests
+from curl_cffi.requests.exceptions import ConnectionError as CurlConnectionError
+from curl_cffi.requests.exceptions import Timeout as CurlTimeout
+from yfinance.data import YfData
+from yfinance.exceptions import YFRateLimitError
+
+from retry import retry_transient
+
+# Applied to the raw quote calls we make; yfinance passes its own 30 s timeout on .info/fast_info requests
+YAHOO_TIMEOUT_SECONDS = 10
+
+# Multi-symbol quote endpoint; Yahoo accepts about 20 symbols per request
+QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+QUOTE_BATCH_SIZE = 20
+
+# Errors worth retrying: timeouts, dropped connections and Yahoo rate limiting
+TRANSIENT_ERRORS = (CurlTimeout, CurlConnectionError, YFRateLimitError, TimeoutError, ConnectionError)
+
+# Shared session so every yfinance call reuses pooled keep-alive connections to Yahoo.
+# yfinance only accepts curl_cffi sessions, which keep one curl handle per thread.
+YF_SESSION = curl_requests.Session(impersonate="chrome")
+
+def get_ticker(symbol: str) -> yf.Ticker:
+    """Build a yfinance Ticker bound to the shared session"""
+    return yf.Ticker(symbol, session=YF_SESSION)
+
+def get_tickers(symbols: list[str]) -> yf.Tickers:
+    """Build a yfinance Tickers container bound to the shared session"""
+    return yf.Tickers(" ".join(symbols), session=YF_SESSION)
+
+@retry_transient(TRANSIENT_ERRORS)
+def fetch_info(ticker: yf.Ticker) -> dict:
+    """Load a Ticker's info blob, retrying transient failures"""
+    return ticker.info
+
+@retry_transient(TRANSIENT_ERRORS)
+def _fetch_quote_chunk(symbols: list[str]) -> list[dict]:
+    # YfData handles Yahoo's cookie/crumb handshake for raw endpoint calls
+    response = YfData(session=YF_SESSION).get_raw_json(
+        QUOTE_URL, params={"symbols": ",".join(symbols)}, timeout=YAHOO_TIMEOUT_SECONDS
+    )
+    return response.get("quoteResponse", {}).get("result") or []
+
+def fetch_quotes(symbols: list[str]) -> dict[str, dict]:
+    """Fetch quotes for many symbols with one request per 20 symbols, keyed by upper-case symbol"""
+    quotes = {}
+    for i in range(0, len(symbols), QUOTE_BATCH_SIZE):
+        for quote in _fetch_quote_chunk(symbols[i:i + QUOTE_BATCH_SIZE]):
+            quotes[quote["symbol"].upper()] = quote
+    return quotes